@@ -1,13 +1,82 @@
-from fastapi import FastAPI, Query
-from services.query_engine import load_data, query_data
+import asyncio
+import logging
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from multiprocessing import Manager
+from fastapi import FastAPI, Query, Request
+from services.query_engine import init_worker, run_query, warm_worker
 from fastapi.middleware.cors import CORSMiddleware
-from services.semantic_parser_spacy import parse_question_spacy
 
-# Initialize FastAPI application
-app = FastAPI()
+logger = logging.getLogger(__name__)
+
+def worker_count() -> int:
+    """
+    Number of worker processes to run. Uses the CPUs this process may run on,
+    so container CPU limits are respected, and never returns less than one.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+async def start_pool() -> ProcessPoolExecutor:
+    """
+    Starts a process pool for query work. Each worker loads the CSV data and
+    spaCy model once, so parsing and pandas work run in parallel across cores.
+    The pool is warmed before it is returned, so a data load failure raises here.
+    """
+    workers = worker_count()
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker)
+    try:
+        # One warm-up task per worker; the shared barrier keeps any worker from
+        # taking a second task, so every worker has to finish loading first
+        loop = asyncio.get_running_loop()
+        with Manager() as manager:
+            barrier = manager.Barrier(workers)
+            await asyncio.gather(*(
+                loop.run_in_executor(executor, warm_worker, barrier)
+                for _ in range(workers)
+            ))
+    except BaseException:
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    return executor
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Owns the query process pool for the lifetime of the app. A data load
+    failure stops startup. If a worker dies later (e.g. OOM), query_csv
+    replaces the broken pool; see restart_pool.
+    """
+    app.state.executor = await start_pool()
+    app.state.pool_lock = asyncio.Lock()
+    try:
+        yield
+    finally:
+        app.state.executor.shutdown(wait=True)
+
+async def restart_pool(app: FastAPI, broken: ProcessPoolExecutor) -> ProcessPoolExecutor:
+    """
+    Replaces a broken process pool with a fresh, warmed one. Concurrent
+    requests that saw the same broken pool share a single restart.
+    """
+    async with app.state.pool_lock:
+        if app.state.executor is broken:
+            logger.warning("Query process pool is broken; starting a new one")
+            broken.shutdown(wait=False, cancel_futures=True)
+            app.state.executor = await start_pool()
+    return app.state.executor
+
+# LRU cache of answers keyed on the normalized question. The loaded data never
+# changes, so repeated questions are answered without leaving the app process.
+RESPONSE_CACHE_SIZE = 4096
+response_cache: "OrderedDict[str, str]" = OrderedDict()
 
-# Load CSV data into memory at startup
-data_store = load_data()
+# Initialize FastAPI application
+app = FastAPI(lifespan=lifespan)
 
 # Enable CORS for frontend access (e.g., React Native app)
 # You can restrict origins later for security
@@ -20,14 +89,31 @@ app.add_middleware(
 )
 
 @app.get("/query")
-def query_csv(
+async def query_csv(
+    request: Request,
     question: str = Query(..., description="Ask a question about your orders or finances")
 ) -> dict:
     """
     Endpoint to handle natural language queries about CSV data.
     Accepts a 'question' string and returns a formatted answer.
     """
-    response = query_data(question, data_store)
+    key = question.strip().lower()
+    response = response_cache.get(key)
+    if response is not None:
+        response_cache.move_to_end(key)
+        return {"answer": response}
+
+    loop = asyncio.get_running_loop()
+    executor = request.app.state.executor
+    try:
+        response = await loop.run_in_executor(executor, run_query, key)
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM); retry once on a fresh pool
+        executor = await restart_pool(request.app, executor)
+        response = await loop.run_in_executor(executor, run_query, key)
+    response_cache[key] = response
+    if len(response_cache) > RESPONSE_CACHE_SIZE:
+        response_cache.popitem(last=False)
     return {"answer": response}
 
 @app.get("/")
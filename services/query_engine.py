@@ -1,159 +1,435 @@
+import numpy as np
 import pandas as pd
-from typing import Dict
-from difflib import get_close_matches
+import polars as pl
+import pyarrow as pa
+import pyarrow.csv as pacsv
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Set, Tuple
+from numba import njit
+from rapidfuzz import process, fuzz
 from .semantic_parser_spacy import parse_question_spacy
+import logging
+import os
 import time
 
-def load_data() -> Dict[str, pd.DataFrame]:
+logger = logging.getLogger(__name__)
+
+# Explicit Arrow types for the columns the query engine relies on;
+# remaining columns are inferred by the Arrow CSV reader.
+CUSTOMER_SCHEMA = {"CID": pa.int64(), "FNAME1": pa.string(), "LNAME": pa.string(), "CITY": pa.string()}
+INVENTORY_SCHEMA = {"IID": pa.int64(), "CID": pa.int64()}
+DETAIL_SCHEMA = {"IID": pa.int64(), "price_table_item_id": pa.int64(), "item_count": pa.int64()}
+PRICELIST_SCHEMA = {"item_id": pa.int64(), "name": pa.string(), "baseprice": pa.float64()}
+
+def read_csv(path: str, column_types: dict) -> pd.DataFrame:
+    """
+    Reads a CSV file with the multi-threaded Arrow reader and returns an
+    Arrow-backed pandas DataFrame.
+    """
+    table = pacsv.read_csv(path, convert_options=pacsv.ConvertOptions(column_types=column_types))
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+@dataclass(slots=True)
+class DataStore:
+    """
+    In-memory query data. Hot paths read the typed numpy columns and prebuilt
+    indexes directly; the DataFrames are kept for the less frequent display paths.
+    """
+    # Source tables
+    customer: pd.DataFrame
+    inventory: pd.DataFrame
+    detail: pd.DataFrame
+    pricelist: pd.DataFrame
+
+    # Column arrays
+    inventory_iid: np.ndarray
+    pricelist_item_id: np.ndarray
+    pricelist_name: np.ndarray
+    pricelist_baseprice: np.ndarray
+
+    # Customer lookups
+    customer_full_names: List[str]
+    customer_cids: np.ndarray
+    cust_by_cid: Dict[int, Dict[str, str]]
+    cust_by_city: Dict[str, np.ndarray]
+    city_keys: List[str]
+    city_trigrams: Dict[str, Set[int]]
+
+    # Pricelist lookups
+    pricelist_name_lower: List[str]
+    pricelist_trigrams: Dict[str, Set[int]]
+    price_by_item_id: Dict[int, Tuple[str, float]]
+    never_ordered_mask: np.ndarray
+    pop_ids: np.ndarray
+    pop_vals: np.ndarray
+
+    # Polars LazyFrame views of the source tables
+    lazy: Dict[str, pl.LazyFrame]
+
+    # Answers to non-parameterized intents (see precompute_aggregates)
+    precomputed: Dict[str, Any] = field(default_factory=dict)
+
+def load_data() -> DataStore:
     """
-    Loads CSV files into pandas DataFrames and returns them as a dictionary.
-    Assumes files are located in the 'data/' directory.
+    Loads CSV files into pandas DataFrames and builds the DataStore used by
+    query_data. Assumes files are located in the 'data/' directory.
     """
-    customer_df = pd.read_csv("data/Customers.csv")
-    inventory_df = pd.read_csv("data/Inventory.csv")
-    detail_df = pd.read_csv("data/Detail.csv")
-    pricelist_df = pd.read_csv("data/Pricelist.csv")
-    print("Inventory columns:", inventory_df.columns.tolist())
+    customer_df = read_csv("data/Customers.csv", CUSTOMER_SCHEMA)
+    inventory_df = read_csv("data/Inventory.csv", INVENTORY_SCHEMA)
+    detail_df = read_csv("data/Detail.csv", DETAIL_SCHEMA)
+    pricelist_df = read_csv("data/Pricelist.csv", PRICELIST_SCHEMA)
+    logger.debug("Inventory columns: %s", inventory_df.columns.tolist())
+
+    # Repeated identifiers as categoricals: integer codes plus a small dictionary
+    inventory_df["CID"] = inventory_df["CID"].astype("category")
+    customer_df["CITY"] = customer_df["CITY"].astype("category")
+
+    # Full names for fuzzy customer matching, with CIDs in the same order
+    full_names = customer_df["FNAME1"].fillna("") + " " + customer_df["LNAME"].fillna("")
 
-    return {
-        "customer": customer_df,
-        "inventory": inventory_df,
-        "detail": detail_df,
-        "pricelist": pricelist_df
-    }
+    # Hash indexes: CID -> name fields, lowercased city -> customer row positions
+    # (first row wins for a repeated CID)
+    cust_by_cid = (
+        customer_df.drop_duplicates("CID", keep="first")
+        .set_index("CID")[["FNAME1", "LNAME"]]
+        .to_dict("index")
+    )
+    cust_by_city = customer_df.groupby(customer_df["CITY"].str.lower()).indices
+    city_keys = list(cust_by_city)
 
-def fuzzy_match_name(name: str, customer_df: pd.DataFrame) -> str:
+    # Lowercased item names with a trigram index for substring lookups
+    pricelist_name_lower = pricelist_df["name"].fillna("").str.lower().tolist()
+
+    # Pricelist rows that never appear on an order line
+    ordered_ids = set(detail_df["price_table_item_id"].unique())
+    never_ordered_mask = ~pricelist_df["item_id"].isin(ordered_ids).to_numpy(dtype=bool)
+
+    # Units sold per pricelist item, as parallel arrays for argmax/argmin
+    popularity = detail_df.groupby("price_table_item_id")["item_count"].sum()
+
+    pricelist_item_id = pricelist_df["item_id"].to_numpy(dtype=np.int64)
+    pricelist_name = pricelist_df["name"].fillna("").to_numpy(dtype=object)
+    pricelist_baseprice = pricelist_df["baseprice"].to_numpy(dtype=np.float64)
+
+    # item_id -> (name, baseprice), first row wins for a repeated item_id
+    first_items = pricelist_df.drop_duplicates("item_id", keep="first")
+    price_by_item_id = dict(zip(
+        first_items["item_id"].to_numpy(dtype=np.int64),
+        zip(first_items["name"].fillna("").to_numpy(dtype=object), first_items["baseprice"].to_numpy(dtype=np.float64))
+    ))
+
+    data_store = DataStore(
+        customer=customer_df,
+        inventory=inventory_df,
+        detail=detail_df,
+        pricelist=pricelist_df,
+        inventory_iid=inventory_df["IID"].to_numpy(dtype=np.int64),
+        pricelist_item_id=pricelist_item_id,
+        pricelist_name=pricelist_name,
+        pricelist_baseprice=pricelist_baseprice,
+        customer_full_names=full_names.tolist(),
+        customer_cids=customer_df["CID"].to_numpy(dtype=np.int64),
+        cust_by_cid=cust_by_cid,
+        cust_by_city=cust_by_city,
+        city_keys=city_keys,
+        city_trigrams=build_trigram_index(city_keys),
+        pricelist_name_lower=pricelist_name_lower,
+        pricelist_trigrams=build_trigram_index(pricelist_name_lower),
+        price_by_item_id=price_by_item_id,
+        never_ordered_mask=never_ordered_mask,
+        pop_ids=popularity.index.to_numpy(dtype=np.int64),
+        pop_vals=popularity.to_numpy(dtype=np.int64),
+        lazy={
+            "inventory": pl.from_pandas(inventory_df).lazy(),
+            "detail": pl.from_pandas(detail_df).lazy(),
+            "pricelist": pl.from_pandas(pricelist_df).lazy()
+        }
+    )
+    data_store.precomputed = precompute_aggregates(data_store)
+    return data_store
+
+def precompute_aggregates(data_store: DataStore) -> Dict[str, Any]:
+    """
+    Computes the answers to non-parameterized intents once at startup.
+    The CSV data is static, so these never change between queries.
+    An answer whose input is empty is stored as None so one bad table
+    only affects its own intents instead of stopping the service.
+    """
+    pricelist_df = data_store.pricelist
+    cust_by_cid = data_store.cust_by_cid
+    precomputed = {}
+
+    precomputed["total_orders"] = np.unique(data_store.inventory_iid).size
+    precomputed["total_items"] = np.unique(data_store.pricelist_item_id).size
+
+    prices = data_store.pricelist_baseprice
+    positive_prices = prices[prices > 0]
+    precomputed["average_price"] = positive_prices.mean() if positive_prices.size else None
+
+    priced = pricelist_df[pricelist_df["baseprice"] > 0]
+    precomputed["most_expensive_item"] = None
+    if not pricelist_df.empty:
+        item = pricelist_df.nlargest(1, "baseprice").iloc[0]
+        precomputed["most_expensive_item"] = (item["name"], item["baseprice"])
+    precomputed["cheapest_item"] = None
+    if not priced.empty:
+        item = priced.nsmallest(1, "baseprice").iloc[0]
+        precomputed["cheapest_item"] = (item["name"], item["baseprice"])
+
+    # Stock levels are optional in the pricelist export
+    if "stock" in pricelist_df.columns:
+        precomputed["out_of_stock_items"] = pricelist_df[pricelist_df["stock"] == 0]["name"].tolist()
+        precomputed["in_stock_items"] = pricelist_df[pricelist_df["stock"] > 0]["name"].tolist()
+
+    precomputed["never_ordered_items"] = data_store.pricelist_name[data_store.never_ordered_mask].tolist()
+
+    pop_ids = data_store.pop_ids
+    pop_vals = data_store.pop_vals
+    price_by_item_id = data_store.price_by_item_id
+    precomputed["most_popular_item"] = None
+    precomputed["least_popular_item"] = None
+    if pop_vals.size:
+        top = pop_vals.argmax()
+        if pop_ids[top] in price_by_item_id:
+            name, _ = price_by_item_id[pop_ids[top]]
+            precomputed["most_popular_item"] = (name, pop_vals[top])
+        bottom = pop_vals.argmin()
+        if pop_ids[bottom] in price_by_item_id:
+            name, _ = price_by_item_id[pop_ids[bottom]]
+            precomputed["least_popular_item"] = (name, pop_vals[bottom])
+
+    # Count in category order, then list customers by first appearance so ties
+    # resolve to the earliest customer in the inventory
+    cids = data_store.inventory["CID"]
+    order_counts = cids.value_counts(sort=False).reindex(cids.unique())
+    precomputed["top_customer"] = None
+    precomputed["bottom_customer"] = None
+    if not order_counts.empty:
+        customer = cust_by_cid.get(order_counts.idxmax())
+        if customer:
+            precomputed["top_customer"] = f"{customer['FNAME1']} {customer['LNAME']}"
+        customer = cust_by_cid.get(order_counts.idxmin())
+        if customer:
+            precomputed["bottom_customer"] = f"{customer['FNAME1']} {customer['LNAME']}"
+
+    return precomputed
+
+def build_trigram_index(values: List[str]) -> Dict[str, Set[int]]:
+    """
+    Builds an inverted index mapping each 3-character window of the given
+    (already lowercased) strings to the positions of the strings containing it.
+    """
+    index = defaultdict(set)
+    for position, value in enumerate(values):
+        for start in range(len(value) - 2):
+            index[value[start:start + 3]].add(position)
+    return dict(index)
+
+def trigram_search(needle: str, values: List[str], index: Dict[str, Set[int]]) -> List[int]:
+    """
+    Returns the sorted positions of values containing needle as a substring.
+    Candidates are narrowed by intersecting the needle's trigram postings and
+    then confirmed with an exact substring check.
+    """
+    if len(needle) < 3:
+        candidates = range(len(values))
+    else:
+        postings = [index.get(needle[start:start + 3], set()) for start in range(len(needle) - 2)]
+        candidates = set.intersection(*sorted(postings, key=len))
+    return sorted(position for position in candidates if needle in values[position])
+
+@njit(cache=True)
+def filter_price_range(prices: np.ndarray, lower: float, upper: float) -> np.ndarray:
+    """
+    Returns the positions of prices strictly between lower and upper in one fused pass.
+    """
+    out = np.empty(prices.shape[0], np.int64)
+    n = 0
+    for i in range(prices.shape[0]):
+        p = prices[i]
+        if p > lower and p < upper:
+            out[n] = i
+            n += 1
+    return out[:n]
+
+def format_price_rows(names: np.ndarray, prices: np.ndarray, name_width: int, price_width: int) -> str:
+    """
+    Formats item names and prices as left/right aligned rows in one
+    vectorized numpy pass instead of a per-row f-string.
+    """
+    padded_names = np.char.ljust(names.astype(str), name_width)
+    formatted_prices = np.char.mod(f" $%{price_width}.2f", prices)
+    return "\n".join(np.char.add(padded_names, formatted_prices).tolist())
+
+def fuzzy_match_name(name: str, data_store: DataStore) -> str:
     """
     Attempts to match a customer name to a CID using fuzzy string matching.
     Returns the matched CID or None if no match is found.
     """
-    full_names = customer_df["FNAME1"].fillna("") + " " + customer_df["LNAME"].fillna("")
-    matches = get_close_matches(name, full_names.tolist(), n=1, cutoff=0.6)
-    if matches:
-        matched_row = customer_df[full_names == matches[0]]
-        return matched_row.iloc[0]["CID"]
+    match = process.extractOne(
+        name,
+        data_store.customer_full_names,
+        scorer=fuzz.ratio,
+        score_cutoff=60
+    )
+    if match:
+        _, _, index = match
+        return data_store.customer_cids[index]
     return None
 
-def query_data(question: str, data_store: Dict[str, pd.DataFrame]) -> str:
+# Per-process data for ProcessPoolExecutor workers (see init_worker)
+_worker_store = None
+
+def init_worker() -> None:
+    """
+    Process pool initializer. Loads the CSV data once in each worker process
+    so requests only need to send the question across the process boundary.
+    """
+    global _worker_store
+    _worker_store = load_data()
+
+def warm_worker(barrier) -> int:
+    """
+    Process pool warm-up task. Compiles the Numba kernels against this worker's
+    data, then waits on a barrier shared by one task per worker so that every
+    worker in the pool has finished init_worker before the app starts serving.
+    """
+    filter_price_range(_worker_store.pricelist_baseprice, 0.0, np.inf)
+    barrier.wait()
+    return os.getpid()
+
+def run_query(question: str) -> str:
+    """
+    Process pool entry point. Answers a question using this worker's data.
+    """
+    return query_data(question, _worker_store)
+
+def query_data(question: str, data_store: DataStore) -> str:
     """
     Parses a natural language question and returns a formatted response
     based on the parsed intent and the loaded CSV data.
     """
     parsed = parse_question_spacy(question)
-    print("Thinking about:", question)
-    print("Parsed intent:", parsed)
+    logger.debug("Thinking about: %s", question)
+    logger.debug("Parsed intent: %s", parsed)
     intent = parsed["intent"]
-    time.sleep(0.5)
+
+    # Optional artificial "thinking" delay for UI testing
+    if os.getenv("AQI_DEBUG_DELAY"):
+        time.sleep(0.5)
 
     # Unpack data
-    customer_df = data_store["customer"]
-    inventory_df = data_store["inventory"]
-    detail_df = data_store["detail"]
-    pricelist_df = data_store["pricelist"]
+    names = data_store.pricelist_name
+    prices = data_store.pricelist_baseprice
+    precomputed = data_store.precomputed
 
     # Intent handlers
     if intent == "count_orders":
-        total_orders = len(inventory_df["IID"].drop_duplicates())
-        return f"There are {total_orders} total orders."
+        return f"There are {precomputed['total_orders']} total orders."
 
     elif intent == "total_items":
-        total_items = pricelist_df["item_id"].nunique()
-        return f"There are {total_items} unique items in the pricelist."
+        return f"There are {precomputed['total_items']} unique items in the pricelist."
 
     elif intent == "average_price":
-        filtered = pricelist_df[pricelist_df["baseprice"] > 0]
-        avg_price = filtered["baseprice"].mean()
-        return f"The average price of listed items is ${avg_price:.2f}."
+        if precomputed["average_price"] is None:
+            return "No priced items are available."
+        return f"The average price of listed items is ${precomputed['average_price']:.2f}."
 
     elif intent == "most_expensive_item":
-        item = pricelist_df.sort_values("baseprice", ascending=False).iloc[0]
-        return f"The most expensive item is:\n{item['name']} — ${item['baseprice']:.2f}"
+        if precomputed["most_expensive_item"] is None:
+            return "No items are available in the pricelist."
+        name, price = precomputed["most_expensive_item"]
+        return f"The most expensive item is:\n{name} — ${price:.2f}"
 
     elif intent == "cheapest_item":
-        item = pricelist_df[pricelist_df["baseprice"] > 0].sort_values("baseprice").iloc[0]
-        return f"The cheapest item is:\n{item['name']} — ${item['baseprice']:.2f}"
+        if precomputed["cheapest_item"] is None:
+            return "No priced items are available."
+        name, price = precomputed["cheapest_item"]
+        return f"The cheapest item is:\n{name} — ${price:.2f}"
 
     elif intent == "out_of_stock_items":
-        out_of_stock = pricelist_df[pricelist_df["stock"] == 0]
-        if out_of_stock.empty:
+        if "out_of_stock_items" not in precomputed:
+            return "Stock levels are not available in the pricelist."
+        if not precomputed["out_of_stock_items"]:
             return "All items are currently in stock."
-        items = "\n".join(out_of_stock["name"])
+        items = "\n".join(precomputed["out_of_stock_items"])
         return f"Out of stock items:\n{items}"
 
     elif intent == "in_stock_items":
-        in_stock = pricelist_df[pricelist_df["stock"] > 0]
-        if in_stock.empty:
+        if "in_stock_items" not in precomputed:
+            return "Stock levels are not available in the pricelist."
+        if not precomputed["in_stock_items"]:
             return "No items are currently in stock."
-        items = "\n".join(in_stock["name"])
+        items = "\n".join(precomputed["in_stock_items"])
         return f"In stock items:\n{items}"
 
     elif intent == "never_ordered_items":
-        ordered_ids = detail_df["price_table_item_id"].unique()
-        never_ordered = pricelist_df[~pricelist_df["item_id"].isin(ordered_ids)]
-        if never_ordered.empty:
+        if not precomputed["never_ordered_items"]:
             return "All items have been ordered at least once."
-        items = "\n".join(never_ordered["name"])
+        items = "\n".join(precomputed["never_ordered_items"])
         return f"Items never ordered:\n{items}"
 
     elif intent == "most_popular_item":
-        grouped = detail_df.groupby("price_table_item_id")["item_count"].sum()
-        top_id = grouped.idxmax()
-        item = pricelist_df[pricelist_df["item_id"] == top_id].iloc[0]
-        return f"The most popular item is:\n{item['name']} — {grouped[top_id]} units sold"
+        if precomputed["most_popular_item"] is None:
+            return "No order data is available to rank items."
+        name, units = precomputed["most_popular_item"]
+        return f"The most popular item is:\n{name} — {units} units sold"
 
     elif intent == "least_popular_item":
-        grouped = detail_df.groupby("price_table_item_id")["item_count"].sum()
-        bottom_id = grouped.idxmin()
-        item = pricelist_df[pricelist_df["item_id"] == bottom_id].iloc[0]
-        return f"The least popular item is:\n{item['name']} — {grouped[bottom_id]} units sold"
+        if precomputed["least_popular_item"] is None:
+            return "No order data is available to rank items."
+        name, units = precomputed["least_popular_item"]
+        return f"The least popular item is:\n{name} — {units} units sold"
 
     elif intent == "top_customer":
-        top_cid = inventory_df["CID"].value_counts().idxmax()
-        customer = customer_df[customer_df["CID"] == top_cid].iloc[0]
-        full_name = f"{customer['FNAME1']} {customer['LNAME']}"
-        return f"The top customer is:\n{full_name} — most orders placed"
+        if precomputed["top_customer"] is None:
+            return "No order data is available to rank customers."
+        return f"The top customer is:\n{precomputed['top_customer']} — most orders placed"
 
     elif intent == "bottom_customer":
-        bottom_cid = inventory_df["CID"].value_counts().idxmin()
-        customer = customer_df[customer_df["CID"] == bottom_cid].iloc[0]
-        full_name = f"{customer['FNAME1']} {customer['LNAME']}"
-        return f"The customer with the fewest orders is:\n{full_name}"
+        if precomputed["bottom_customer"] is None:
+            return "No order data is available to rank customers."
+        return f"The customer with the fewest orders is:\n{precomputed['bottom_customer']}"
 
     elif intent == "item_price":
         item_name = parsed["item_name"]
-        matches = pricelist_df[
-            pricelist_df["name"].str.contains(item_name, case=False, na=False)
-            & (pricelist_df["baseprice"] > 0)
-        ]
-        if matches.empty:
-            return f"No priced item found matching '{item_name}'."
-        items = "\n".join(
-            f"{row['name']:<25} ${row['baseprice']:>6.2f}"
-            for _, row in matches.iterrows()
+        positions = np.asarray(
+            trigram_search(item_name.lower(), data_store.pricelist_name_lower, data_store.pricelist_trigrams),
+            dtype=np.int64
         )
+        positions = positions[prices[positions] > 0]
+        if positions.size == 0:
+            return f"No priced item found matching '{item_name}'."
+        items = format_price_rows(names[positions], prices[positions], 25, 6)
         return f"Prices for items matching '{item_name}':\n{items}"
 
     elif intent == "orders_by_customer":
         cid_or_name = parsed["cid"]
-        matched_cid = fuzzy_match_name(cid_or_name, customer_df)
+        matched_cid = fuzzy_match_name(cid_or_name, data_store)
         if not matched_cid:
             return f"No customer found matching '{cid_or_name}'."
 
-        orders = inventory_df[inventory_df["CID"] == matched_cid]
-        if orders.empty:
+        lazy = data_store.lazy
+        orders = lazy["inventory"].filter(pl.col("CID") == matched_cid).select("IID").collect()
+        if orders.is_empty():
             return f"Customer '{cid_or_name}' has no orders."
 
-        details = detail_df[detail_df["IID"].isin(orders["IID"])].drop_duplicates()
-        enriched = details.merge(
-            pricelist_df,
-            left_on="price_table_item_id",
-            right_on="item_id",
-            how="left"
+        # Single fused plan: order lines -> pricelist names -> units per item
+        summary = (
+            lazy["detail"]
+            .join(orders.lazy(), on="IID", how="semi")
+            .unique(maintain_order=True)
+            .join(lazy["pricelist"], left_on="price_table_item_id", right_on="item_id", how="left")
+            .drop_nulls("name")
+            .group_by("name")
+            .agg(pl.col("item_count").sum())
+            .sort("name")
+            .collect()
         )
-        summary = enriched.groupby("name")["item_count"].sum().reset_index()
         items = "\n".join(
-            f"{row['item_count']}× {row['name']}"
-            for _, row in summary.iterrows()
+            f"{item_count}× {name}"
+            for name, item_count in summary.iter_rows()
         )
         return f"Customer '{cid_or_name}' ordered:\n{items}"
 
@@ -163,35 +439,33 @@ def query_data(question: str, data_store: Dict[str, pd.DataFrame]) -> str:
 
         # Filter and sort items by price, excluding zero-priced entries
         if direction == "above":
-            filtered = pricelist_df[
-                (pricelist_df["baseprice"] > threshold) & (pricelist_df["baseprice"] > 0)
-            ].sort_values("baseprice", ascending=False)
+            positions = filter_price_range(prices, max(threshold, 0.0), np.inf)
+            positions = positions[np.argsort(-prices[positions], kind="stable")]
         else:
-            filtered = pricelist_df[
-                (pricelist_df["baseprice"] < threshold) & (pricelist_df["baseprice"] > 0)
-            ].sort_values("baseprice")
+            positions = filter_price_range(prices, 0.0, threshold)
+            positions = positions[np.argsort(prices[positions], kind="stable")]
 
-        if filtered.empty:
+        if positions.size == 0:
             return f"No items found with price {direction} ${threshold:.2f}."
 
         # Format output with aligned columns
         header = f"{'Item Name':<30} {'Price':>10}"
         divider = "-" * 42
-        rows = "\n".join(
-            f"{row['name']:<30} ${row['baseprice']:>9.2f}"
-            for _, row in filtered.iterrows()
-        )
+        rows = format_price_rows(names[positions], prices[positions], 30, 9)
         return f"Items priced {direction} ${threshold:.2f}:\n\n{header}\n{divider}\n{rows}"
 
     elif intent == "filter_by_city":
         city = parsed["city"]
-        matches = customer_df[customer_df["CITY"].str.contains(city, case=False, na=False)]
-        if matches.empty:
+        cust_by_city = data_store.cust_by_city
+        city_keys = data_store.city_keys
+
+        # Substring match against the distinct cities, then gather their rows
+        positions = trigram_search(city.lower(), city_keys, data_store.city_trigrams)
+        postings = [cust_by_city[city_keys[i]] for i in positions]
+        if not postings:
             return f"No customer found matching '{city}'."
-        names = "\n".join(
-            f"{row['FNAME1']} {row['LNAME']}"
-            for _, row in matches.iterrows()
-        )
+        full_names = data_store.customer_full_names
+        names = "\n".join(full_names[i] for i in np.sort(np.concatenate(postings)))
         return f"Customers in {city}:\n{names}"
 
     # Fallback response
@@ -6,6 +6,7 @@ Supports synonym matching, price filters, location filters, customer queries, an
 
 import spacy
 import re
+import ahocorasick
 
 # Load spaCy English model
 nlp = spacy.load("en_core_web_sm")
@@ -32,6 +33,22 @@ INTENT_SYNONYMS = {
     "daily_orders": ["orders today", "orders in past day", "orders in last day", "today's orders"],
 }
 
+# Aho-Corasick automaton over all synonym phrases, built once at import.
+# Each phrase maps to (priority, intent) so earlier intents in INTENT_SYNONYMS win.
+AUTOMATON = ahocorasick.Automaton()
+for priority, (intent, phrases) in enumerate(INTENT_SYNONYMS.items()):
+    for phrase in phrases:
+        if phrase not in AUTOMATON:
+            AUTOMATON.add_word(phrase, (priority, intent))
+AUTOMATON.make_automaton()
+
+# Precompiled regex patterns for parameterized intents
+PAT_CITY = re.compile(r"(?:customers|orders) (?:in|from) ([a-z\s]+)")
+PAT_PRICE_ABOVE = re.compile(r"(?:items|products|things|orders).*?(?:over|above|greater than)\s*\$?(\d+)")
+PAT_PRICE_BELOW = re.compile(r"(?:items|products|things|orders).*?(?:under|below|less than)\s*\$?(\d+)")
+PAT_FUZZY_PRODUCT = re.compile(r"(?:orders|purchases).*?(?:like|similar to|containing|with) (.+)")
+PAT_CUSTOMER = re.compile(r"(?:what did|what has|show me what) (.+?) (?:order|buy|purchase)")
+
 def parse_question_spacy(question: str) -> dict:
     """
     Parses a natural language question and returns a structured intent dictionary.
@@ -45,31 +62,31 @@ def parse_question_spacy(question: str) -> dict:
     """
     q = question.lower().strip()
 
-    # Synonym-based intent matching
-    for intent, phrases in INTENT_SYNONYMS.items():
-        if any(phrase in q for phrase in phrases):
-            return {"intent": intent}
+    # Synonym-based intent matching (single pass over the question)
+    matched = min((value for _, value in AUTOMATON.iter(q)), default=None)
+    if matched:
+        return {"intent": matched[1]}
 
     # Location-based queries (e.g., "customers in Raleigh")
-    match = re.search(r"(?:customers|orders) (?:in|from) ([a-z\s]+)", q)
+    match = PAT_CITY.search(q)
     if match:
         return {"intent": "filter_by_city", "city": match.group(1).strip()}
 
     # Price filters (e.g., "items over $50")
-    match = re.search(r"(?:items|products|things|orders).*?(?:over|above|greater than)\s*\$?(\d+)", q)
+    match = PAT_PRICE_ABOVE.search(q)
     if match:
         return {"intent": "price_filter", "threshold": float(match.group(1)), "direction": "above"}
-    match = re.search(r"(?:items|products|things|orders).*?(?:under|below|less than)\s*\$?(\d+)", q)
+    match = PAT_PRICE_BELOW.search(q)
     if match:
         return {"intent": "price_filter", "threshold": float(match.group(1)), "direction": "below"}
 
     # Fuzzy product matching (e.g., "orders with something like Widget")
-    match = re.search(r"(?:orders|purchases).*?(?:like|similar to|containing|with) (.+)", q)
+    match = PAT_FUZZY_PRODUCT.search(q)
     if match:
         return {"intent": "fuzzy_product_match", "product_hint": match.group(1).strip()}
 
     # Customer-specific queries (e.g., "what did John Smith order")
-    match = re.search(r"(?:what did|what has|show me what) (.+?) (?:order|buy|purchase)", q)
+    match = PAT_CUSTOMER.search(q)
     if match:
         return {"intent": "customer_orders", "customer_name": match.group(1)}
 